@@ -4,7 +4,7 @@
 This script is used to establish vnc connection with a tigervnc
 
 \033[1mSyntax\033[0m:
-    startvnc.py [<s|l>xxx|ip-address] [server|connect|stop]
+    startvnc.py [<s|l>xxx|ip-address][,...] [server|connect|stop]
 
 \033[1mUsage\033[0m:
    \033[1m\033[0m Start server (if not running)
@@ -15,20 +15,155 @@ This script is used to establish vnc connection with a tigervnc
     startvnc.py l184 start           # start server at 192.168.200.184 (labor)
     startvnc.py s157 connect         # connect with ip 192.168.101.157
     startvnc.py 192.168.200.193 stop # stop server of given ip
+    startvnc.py l180-l195 stop       # stop servers of 192.168.200.180-195
+    startvnc.py l180,s157 start      # start servers at both in background
 
 version 1.0
 """
+from __future__ import annotations
+
+import atexit
 import functools
 import os
-import re
-import shlex
+import select
+import signal
 import subprocess
 import sys
 import time
-from typing import Any, Callable, cast, Optional, TypeVar
 
+# typing is only needed by type checkers, save its import at runtime
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import (Any, Callable, Dict, Iterable, List, Optional,
+                        Sequence, Tuple, TypeVar)
+
+    F = TypeVar('F', bound=Callable[..., Any])
+
+
+MAX_WORKERS = 16    # hosts handled at once, avoid ssh rate limits
+MASTER_TTL = 60     # seconds a master connection stays open when idle
+TIMEOUT = 30        # seconds to wait for a command at remote
+CONTROL_TIMEOUT = 5     # seconds to wait for 'ssh -O' on the local master
+
+# remote --> monotonic time of last use of its master connection
+_pool: Dict[str, float] = {}
+# control socket --> remote of master connections started by this process
+_owned: Dict[str, str] = {}
+
+
+class RemoteError(Exception):
+    """base error of a failed ssh call to remote"""
+
+
+class RemoteTimeout(RemoteError):
+    """ssh call did not finish in the given time"""
+
+
+class RemoteConnectionError(RemoteError):
+    """ssh could not connect to remote (exit code 255)"""
+
+
+@functools.lru_cache(maxsize=1)
+def passwd_arg() -> Tuple[str, ...]:
+    """function to get vncviewer's password option
+    looked up once, call passwd_arg.cache_clear() to refresh
+    Returns:
+        parg (tuple): ('-passwd', '~/.vnc/labs') if the file exists
+        otherwise empty
+    """
+    pfile = os.path.expanduser('~/.vnc/labs')
+    return ('-passwd', pfile) if os.path.isfile(pfile) else ()
+
+
+def spawn_wait(cmd: List[str], discard: Sequence[int] = (1,),
+               timeout: float = TIMEOUT) -> int:
+    """function to run a local command where only exit code matters
+    started by posix_spawn without pipes, nothing to drain afterwards
+    Args:
+        cmd (list): program and its arguments
+        discard (list): file descriptors redirected to /dev/null
+        timeout (float): seconds to wait before cmd is killed
+    Returns:
+        returncode (int): of cmd, negative if killed by a signal
+    Raises:
+        subprocess.TimeoutExpired: if cmd did not finish within timeout
+    """
+    if not hasattr(os, 'pidfd_open'):
+        # no pidfd (not linux): let subprocess handle the timeout
+        null = subprocess.DEVNULL
+        return subprocess.run(cmd, stdout=null if 1 in discard else None,
+                              stderr=null if 2 in discard else None,
+                              timeout=timeout).returncode
+    devnull = [(os.POSIX_SPAWN_OPEN, fd, os.devnull, os.O_WRONLY, 0)
+               for fd in discard]
+    pid = os.posix_spawnp(cmd[0], cmd, os.environ, file_actions=devnull)
+    # pidfd becomes readable once cmd exits --> reaped without delay
+    pidfd = os.pidfd_open(pid)
+    try:
+        poller = select.poll()
+        poller.register(pidfd, select.POLLIN)
+        exited = poller.poll(timeout * 1000)
+    finally:
+        os.close(pidfd)
+    if not exited:
+        os.kill(pid, signal.SIGKILL)
+        os.waitpid(pid, 0)
+        raise subprocess.TimeoutExpired(cmd, timeout)
+    _, status = os.waitpid(pid, 0)
+    return os.waitstatus_to_exitcode(status)
+
+
+def ssh_control(ctl: str, remote: str, op: str, *flags: str) -> int:
+    """function to send a control command to a master connection
+    Args:
+        ctl (str): control socket of the master
+        remote (str): form 'procs@ipv4'
+        op (str): ssh -O command e.g. 'check', 'stop', 'cancel'
+        flags (str): additional ssh options e.g. '-L', '9900:...'
+    Returns:
+        returncode (int): of ssh, non-zero if no master is running
+        or it did not answer within CONTROL_TIMEOUT
+    """
+    cmd = ['ssh', '-O', op, '-o', 'ControlPath=' + ctl, *flags, remote]
+    try:
+        return spawn_wait(cmd, discard=(1, 2), timeout=CONTROL_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        return -1
+
+
+def close_masters() -> None:
+    """function to release all master connections started by this process
+    registered with atexit, see Vnc.close_master
+    """
+    for ctl, remote in list(_owned.items()):
+        ssh_control(ctl, remote, 'stop')
+    _owned.clear()
+
+
+atexit.register(close_masters)
 
-F = TypeVar('F', bound=Callable[..., Any])
+
+def expand_hosts(arg: str) -> List[str]:
+    """function to expand a host list given on command line
+    entries are separated by ',', shortnames allow an inclusive range
+    e.g.  'l180-l182,s157' --> ['l180', 'l181', 'l182', 's157']
+    Args:
+        arg (str): comma separated hosts and ranges of shortnames
+    Returns:
+        hosts (list): single hosts, invalid entries (also ranges with
+        first > last) are passed as is
+    """
+    hosts = []
+    for part in arg.split(','):
+        first, sep, last = part.partition('-')
+        if (sep and len(first) == len(last) == 4 and first[0] == last[0]
+                and first[1:].isdigit() and last[1:].isdigit()
+                and first[1:] <= last[1:]):
+            hosts += ['{}{:03d}'.format(first[0], num)
+                      for num in range(int(first[1:]), int(last[1:]) + 1)]
+        else:
+            hosts.append(part)
+    return hosts
 
 
 def check_remote(func: F) -> F:
@@ -45,7 +180,7 @@ def check_remote(func: F) -> F:
         else:
             print("Could not identify ip from paramter: {}"
                   .format(self.ip), file=sys.stderr)
-    return cast(F, wrapper)
+    return wrapper  # type: ignore[return-value]
 
 
 class Vnc:
@@ -54,6 +189,15 @@ class Vnc:
     """
     __SERVER = 'x0tigervncserver'   # vnc program name
     __CLIENT = 'vncviewer'
+    # fail fast on unreachable hosts and never hang on a prompt
+    # set STARTVNC_SSH_OPTS (may be empty) if ~/.ssh/config has them already
+    __SSH_OPTS = tuple(os.environ.get(
+        'STARTVNC_SSH_OPTS',
+        '-o ConnectTimeout=5 -o ServerAliveInterval=15 -o BatchMode=yes'
+    ).split())
+    __TTL = 5.0     # seconds to trust the cached number of vncviewer
+    # (monotonic timestamp, number of vncviewer) shared by all instances
+    _viewers: Tuple[float, int] = (float('-inf'), 0)
 
     def __init__(self, ip_address: str) -> None:
         """constructor of Vnc takes an input string
@@ -65,39 +209,108 @@ class Vnc:
         """
         self.ip = ip_address
         self.remote = self.get_remote(ip_address)
+        # socket of the shared ssh connection (OpenSSH ControlMaster)
+        self._ctl = os.path.expanduser('~/.ssh/cm-{}.sock'
+                                       .format(self.remote))
+        # ssh with all fixed options, only the per call part is appended
+        self._ssh_base = ('ssh', '-o', 'ControlMaster=auto',
+                          '-o', 'ControlPath=' + self._ctl,
+                          '-o', 'ControlPersist={}s'.format(MASTER_TTL),
+                          *self.__SSH_OPTS)
 
     @staticmethod
     def get_remote(ip_address: str) -> Optional[str]:
         """function to parse argument
-        use regex to check either of of two matches '^(m1)|(m2)$'
-        --> match.groups(): (g1, g2, g3, g4)
-        match1:       s156
-                --> ('s156', 's', '156', None)
-        match2:       192.168.101.156
-                --> (None, None, None, '192.168.101.156')
+        accept either a shortname or a full ipv4 address
+        shortname:    s156 --> 192.168.101.156
+                      l193 --> 192.168.200.193
+        ipv4:         192.168.101.156 --> 192.168.101.156
         Args:
             ip_address (str): string to identify ipv4
         Returns:
             ipv4 (str): if input valid otherwise None
         """
-        m = re.match(r"""^
-                     (([ls])(\d{3}))            #m1: match shortname
-                     |                          #or
-                     ((?:\d{3}\.){3}\d{3})      #m2: match ipv4
-                     $""", ip_address, re.X)
-        remote = None
-        if m:
-            remote = 'procs@'
-            # print(m.groups())
-            if m.group(1):
-                # 's' --> 192.168.101 |  'l' --> 192.168.200.
-                octet3 = '200.' if m.group(2) == 'l' else '101.'
-                octet12 = '192.168.'
-                remote += octet12 + octet3 + m.group(3)
-            else:
-                remote += m.group(4)
-        # print(remote)
-        return remote
+        s = ip_address
+        if (len(s) == 4 and s[0] in 'ls'
+                and s[1:].isascii() and s[1:].isdigit()):
+            # 's' --> 192.168.101 |  'l' --> 192.168.200.
+            octet3 = '200.' if s[0] == 'l' else '101.'
+            return 'procs@192.168.' + octet3 + s[1:]
+        # imported here, shortnames are the common case
+        import ipaddress
+        try:
+            ipaddress.IPv4Address(s)
+        except ValueError:
+            return None
+        return 'procs@' + s
+
+    @classmethod
+    def parse_hosts(cls, hosts: Iterable[str]) -> List[Optional[str]]:
+        """function to parse many hosts at once e.g. for cluster operations
+        each distinct host is parsed only once
+        Args:
+            hosts (iterable): shortnames or ipv4 addresses
+        Returns:
+            remotes (list): form 'procs@ipv4' per host, None if invalid
+        """
+        parsed: Dict[str, Optional[str]] = {}
+        remotes = []
+        for host in hosts:
+            if host not in parsed:
+                parsed[host] = cls.get_remote(host)
+            remotes.append(parsed[host])
+        return remotes
+
+    def _ssh(self, *argv: str, flags: Sequence[str] = (),
+             timeout: Optional[float] = TIMEOUT,
+             **kwargs: Any) -> subprocess.CompletedProcess:
+        """function to run a command at remote over ssh
+        Args:
+            argv (str): remote command and its arguments
+            flags (list): additional ssh options e.g. ['-t']
+            timeout (float): seconds to wait for ssh, None for no limit
+            kwargs: passed through to subprocess.run
+        Returns:
+            result (CompletedProcess): of the finished ssh call
+        Raises:
+            RemoteTimeout: if ssh did not finish within timeout
+            RemoteConnectionError: if ssh could not reach remote
+        """
+        self._check_master()
+        cmd = [*self._ssh_base, *flags, str(self.remote), *argv]
+        try:
+            res = subprocess.run(cmd, timeout=timeout, **kwargs)
+        except subprocess.TimeoutExpired:
+            raise RemoteTimeout("ssh to {} timed out after {}s"
+                                .format(self.remote, timeout)) from None
+        if res.returncode == 255:
+            raise RemoteConnectionError("could not connect to {}"
+                                        .format(self.remote))
+        return res
+
+    def _spawn(self, *argv: str, timeout: float = TIMEOUT) -> int:
+        """function to run a command at remote where only exit code matters
+        ssh is started by posix_spawn without pipes, stdout is discarded
+        Args:
+            argv (str): remote command and its arguments
+            timeout (float): seconds to wait for ssh
+        Returns:
+            returncode (int): of the remote command
+        Raises:
+            RemoteTimeout: if ssh did not finish within timeout
+            RemoteConnectionError: if ssh could not reach remote
+        """
+        self._check_master()
+        cmd = [*self._ssh_base, str(self.remote), *argv]
+        try:
+            returncode = spawn_wait(cmd, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            raise RemoteTimeout("ssh to {} timed out after {}s"
+                                .format(self.remote, timeout)) from None
+        if returncode == 255:
+            raise RemoteConnectionError("could not connect to {}"
+                                        .format(self.remote))
+        return returncode
 
     @check_remote
     def connect_server(self, localport: int = 9900) -> None:
@@ -112,19 +325,46 @@ class Vnc:
             open addresse 'http://localhost:1234' to see result of googles page
 
         -f: make ssh go in the background
-            it will still be alive by executing 'sleep 5'
+        -N: do not execute a remote command, only forward the port
+        -o ExitOnForwardFailure=yes: go in the background only after
+            forwarding is established, fail immediately otherwise
 
-        vncviewer is then executed and ssh remains open in the background
-        as long as vncviewer makes use of the tunnel
-        ssh is closed once the tunnel is dropped
+        -o Control*: reuse (or create) a master connection to remote
+            following ssh calls only open a channel without new handshake
+
+        the forwarding is held by the master connection
+        vncviewer is then executed and makes use of the tunnel
+        the forwarding is cancelled once vncviewer exits
         """
-        pfile = os.path.expanduser('~/.vnc/labs')
-        parg = ("-passwd " + pfile) if os.path.isfile(pfile) else ""
-        cmd = ("ssh -fL {port}:localhost:5900 {} sleep 5;"
-               "vncviewer {} -DotWhenNoCursor=1 localhost:{port}"
-               .format(self.remote, parg, port=localport))
-        print(cmd)
-        os.system(cmd)
+        fwd = '{}:localhost:5900'.format(localport)
+        print('ssh -fNL {} {}'.format(fwd, self.remote))
+        try:
+            # '-N' runs no remote command, exit code is 0 or 255 only
+            self._ssh(flags=['-fN', '-o', 'ExitOnForwardFailure=yes',
+                             '-L', fwd])
+        except RemoteConnectionError:
+            raise RemoteConnectionError(
+                "could not forward port {} to {} "
+                "(port in use or remote unreachable)"
+                .format(localport, self.remote)) from None
+        try:
+            self._run_viewer(localport)
+        finally:
+            self._control('cancel', '-L', fwd)
+
+    def _run_viewer(self, localport: int) -> None:
+        """function to run vncviewer on a forwarded port until it exits
+        Args:
+            localport (int): local end of the tunnel to tigervnc server
+        """
+        cmd = [self.__CLIENT, *passwd_arg(), '-DotWhenNoCursor=1',
+               'localhost:{}'.format(localport)]
+        print(' '.join(cmd))
+        self._count_viewer(1)
+        try:
+            subprocess.run(cmd)
+        finally:
+            self._count_viewer(-1)
 
     @check_remote
     def start_server(self, term: bool = False) -> None:
@@ -134,73 +374,234 @@ class Vnc:
             allocate a PTY on server side to have interactive prompt in
             ssh shell terminates connection also sends SIGUP to current command
         """
-        cmd = "ssh {} {} 'DISPLAY=:0 {} -rfbauth ~/.vnc/passwd'"\
-              .format('-t' if term else '', self.remote, self.__SERVER)
-        print(cmd)
+        self._check_master()
+        cmd = [*self._ssh_base, *(['-t'] if term else []), str(self.remote),
+               'DISPLAY=:0 {} -rfbauth ~/.vnc/passwd'.format(self.__SERVER)]
+        print(' '.join(cmd))
         if term:
             # keep running interactive
-            subprocess.run(shlex.split(cmd))
+            subprocess.run(cmd)
         else:
             # start as child process in bg
-            subprocess.Popen(shlex.split(cmd),
+            subprocess.Popen(cmd,
                              stdout=subprocess.DEVNULL,
                              stderr=subprocess.STDOUT)
-            # wait a bit after sending cmd via ssh
-            time.sleep(1)
+            # wait until server shows up at remote, at most 1s in total
+            deadline = time.monotonic() + 1
+            while time.monotonic() < deadline:
+                try:
+                    if self._has_server(deadline - time.monotonic()):
+                        break
+                except RemoteTimeout:
+                    break
+                time.sleep(min(0.05, max(deadline - time.monotonic(), 0)))
+
+    def _pattern(self) -> str:
+        """function to get a pgrep pattern for tigervnc server which only
+        matches the server's own command line, not a remote shell running
+        a script that mentions the server
+        e.g. '/usr/bin/x0tigervncserver -rfbauth ...' but not 'sh -c ...'
+        """
+        return "'^([^ ]*/)?{}( |$)'".format(self.__SERVER)
+
+    @staticmethod
+    def _wait_ready() -> str:
+        """function to get a remote shell snippet that waits until the
+        server listens on port 5900, polled every 50ms for at most 1s
+        (without ss/netstat at remote it waits the full second)
+        """
+        return ("i=0; while [ $i -lt 20 ] && ! { ss -ltn || netstat -ltn; } "
+                "2>/dev/null | grep -q ':5900 '; do sleep 0.05; i=$((i+1)); "
+                "done")
+
+    @check_remote
+    def launch_server(self) -> bool:
+        """function to start server detached at remote if it's not running
+        check and start are sent as one remote script to save round trips
+        Returns:
+            is_started (bool): True if server was started by this call
+        """
+        script = ("if ! pgrep -f {pat} >/dev/null; then "
+                  "DISPLAY=:0 nohup {srv} -rfbauth ~/.vnc/passwd "
+                  ">/dev/null 2>&1 & {wait}; echo STARTED; fi"
+                  .format(pat=self._pattern(), srv=self.__SERVER,
+                          wait=self._wait_ready()))
+        res = self._ssh(script, stdout=subprocess.PIPE,
+                        universal_newlines=True)
+        is_started = 'STARTED' in res.stdout
+        if is_started:
+            print("Started {} at {}".format(self.__SERVER, self.remote))
+        elif res.returncode == 0:
+            print("{} already running at {}"
+                  .format(self.__SERVER, self.remote))
+        return is_started
 
     @check_remote
     def stop_server(self) -> None:
         """function to stop tigervnc server"""
-        cmd = ['ssh', str(self.remote), 'killall', self.__SERVER]
-        if subprocess.run(args=cmd, stdout=subprocess.PIPE).returncode == 0:
+        if self._spawn('killall', self.__SERVER) == 0:
             print("Closed {} at {}".format(self.__SERVER, self.remote))
 
+    def _has_server(self, timeout: float = TIMEOUT) -> bool:
+        """function to look up tigervnc server at remote without output"""
+        return self._spawn('pgrep', '-f', self._pattern(),
+                           timeout=timeout) == 0
+
     @check_remote
     def is_server_running(self) -> bool:
         """function to check whether tigervnc server is running at remote"""
-        cmd = ['ssh', str(self.remote), 'pgrep', '-f', self.__SERVER]
-        if subprocess.run(cmd, stdout=subprocess.PIPE).returncode == 0:
+        if self._has_server():
             print("{} already running at {}"
                   .format(self.__SERVER, self.remote))
             return True
         else:
             return False
 
+    def _control(self, op: str, *flags: str) -> int:
+        """function to send a control command to the master connection
+        Args:
+            op (str): ssh -O command e.g. 'check', 'stop', 'cancel'
+            flags (str): additional ssh options e.g. '-L', '9900:...'
+        Returns:
+            returncode (int): of ssh, non-zero if no master is running
+        """
+        return ssh_control(self._ctl, str(self.remote), op, *flags)
+
+    def _check_master(self) -> None:
+        """function to validate master connection before it's reused
+        a socket left by a crashed master is removed so that next ssh
+        call creates a new master instead of stalling on the dead one
+        checked only if master was idle longer than MASTER_TTL
+        a master which isn't running yet is created by the next ssh call
+        --> remembered as started by this process, see close_master
+        """
+        now = time.monotonic()
+        last_use = _pool.get(str(self.remote))
+        if last_use is None or now - last_use > MASTER_TTL:
+            exists = os.path.exists(self._ctl)
+            if not exists or self._control('check') != 0:
+                if exists:
+                    try:
+                        os.unlink(self._ctl)
+                    except FileNotFoundError:
+                        pass
+                _owned[self._ctl] = str(self.remote)
+        _pool[str(self.remote)] = now
+
+    def close_master(self) -> None:
+        """function to release the shared ssh connection to remote
+        only a master started by this process is touched, with 'ssh -O stop'
+        it takes no new sessions but lets running ones (e.g. another viewer
+        multiplexed on it) finish, a master of someone else is left alone
+        """
+        _pool.pop(str(self.remote), None)
+        if _owned.pop(self._ctl, None):
+            self._control('stop')
+
     def is_client_running(self) -> int:
         """function to check whether vncviewer is running at local machine
+        result of pgrep is cached for a few seconds and kept up to date
+        with the viewers started by this script
         Returns:
             num_proc (int): number of vncviewer processes are running
             if success otherwise asumming zero
         """
+        timestamp, num_proc = Vnc._viewers
+        if time.monotonic() - timestamp < self.__TTL:
+            return num_proc
         cmd = ['pgrep', '-c', self.__CLIENT]
         res = subprocess.run(cmd, stdout=subprocess.PIPE,
                              universal_newlines=True)
-        if res.returncode == 0:
-            num_proc = int(res.stdout.strip('\n'))
-            return num_proc
-        else:
-            return 0
+        num_proc = int(res.stdout.strip('\n')) if res.returncode == 0 else 0
+        Vnc._viewers = (time.monotonic(), num_proc)
+        return num_proc
+
+    @staticmethod
+    def _count_viewer(delta: int) -> None:
+        """function to update cached number of vncviewer without pgrep
+        Args:
+            delta (int): +1 for a started viewer, -1 for an exited one
+        """
+        timestamp, num_proc = Vnc._viewers
+        Vnc._viewers = (timestamp, max(num_proc + delta, 0))
 
     @check_remote
     def start_client(self) -> None:
         """function start vnc client and connect with server at remote
         start server if it's not running then connect with server
-        """
-        is_started = False
-        if not self.is_server_running():
-            is_started = True
-            self.start_server(False)
 
+        everything at remote runs in one ssh session which forwards the port:
+        server is started (if needed) and bound to the session by a trap,
+        the session waits on stdin which is closed after vncviewer exits
+        --> remote shell exits and the trap stops the server again
+        """
         num_proc = self.is_client_running()
         listen = 9900
         if num_proc > 0:
             listen += num_proc
             print("{} instance(s) of {} is running. Use forwarding port: {}"
                   .format(num_proc, self.__CLIENT, listen))
-        self.connect_server(listen)
 
-        if is_started:
-            self.stop_server()
+        script = ("if pgrep -f {pat} >/dev/null; then echo RUNNING; else "
+                  "DISPLAY=:0 {srv} -rfbauth ~/.vnc/passwd >/dev/null 2>&1 & "
+                  "pid=$!; trap 'kill $pid' EXIT; trap exit HUP TERM; "
+                  "{wait}; echo STARTED; fi; read _"
+                  .format(pat=self._pattern(), srv=self.__SERVER,
+                          wait=self._wait_ready()))
+        fwd = '{}:localhost:5900'.format(listen)
+        self._check_master()
+        cmd = [*self._ssh_base, '-o', 'ExitOnForwardFailure=yes', '-L', fwd,
+               str(self.remote), script]
+        print('ssh -L {} {}'.format(fwd, self.remote))
+        session = subprocess.Popen(cmd, stdin=subprocess.PIPE,
+                                   stdout=subprocess.PIPE,
+                                   universal_newlines=True)
+        # both are set with PIPE above
+        stdin, stdout = session.stdin, session.stdout
+        assert stdin is not None and stdout is not None
+        try:
+            # first line comes after the server is up or found running
+            ready, _, _ = select.select([stdout], [], [], TIMEOUT)
+            if not ready:
+                session.kill()
+                raise RemoteTimeout("ssh to {} timed out after {}s"
+                                    .format(self.remote, TIMEOUT))
+            state = stdout.readline().strip()
+            if not state:
+                raise RemoteConnectionError("could not connect to {}"
+                                            .format(self.remote))
+            if state == 'RUNNING':
+                print("{} already running at {}"
+                      .format(self.__SERVER, self.remote))
+            self._run_viewer(listen)
+        finally:
+            # remote 'read' returns, trap stops server if started by us
+            stdin.close()
+            try:
+                session.wait(timeout=TIMEOUT)
+            except subprocess.TimeoutExpired:
+                session.kill()
+            self._control('cancel', '-L', fwd)
+
+
+def run(vnc_obj: Vnc, func_param: List[str]) -> bool:
+    """function to call a method of Vnc for one remote
+    Args:
+        vnc_obj (Vnc): remote to work on
+        func_param (list): method name followed by its arguments
+    Returns:
+        success (bool): False if remote is invalid or ssh to it failed
+    """
+    func, *param = func_param
+    try:
+        getattr(vnc_obj, func)(*param)
+    except RemoteError as err:
+        print(err, file=sys.stderr)
+        return False
+    finally:
+        vnc_obj.close_master()
+    # invalid remote is already reported by check_remote
+    return vnc_obj.remote is not None
 
 
 def main() -> None:
@@ -211,19 +612,35 @@ def main() -> None:
             help(Vnc)
         sys.exit(1)
 
-    vnc_obj = Vnc(sys.argv[1])
+    hosts = expand_hosts(sys.argv[1])
 
     # start connection with remote
     if len(sys.argv) == 2:
-        vnc_obj.start_client()
+        func_param = ['start_client']
 
     # call connect method
-    if len(sys.argv) == 3:
+    elif len(sys.argv) == 3:
         cmds = [['start_server', 'True'], ['connect_server'], ['stop_server']]
-        func_param = [cmd for cmd in cmds if sys.argv[2] in cmd[0]]
-        if func_param:
-            func, *param = func_param[0]
-            getattr(vnc_obj, func)(*param)
+        found = [cmd for cmd in cmds if sys.argv[2] in cmd[0]]
+        if not found:
+            return
+        func_param = found[0]
+    else:
+        return
+
+    if len(hosts) > 1 and func_param[0] in ('start_server', 'stop_server'):
+        # interactive server can't share one terminal, start it detached
+        if func_param[0] == 'start_server':
+            func_param = ['launch_server']
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+            results = list(pool.map(lambda h: run(Vnc(h), func_param),
+                                    hosts))
+    else:
+        # viewers are opened one after another
+        results = [run(Vnc(host), func_param) for host in hosts]
+    if not all(results):
+        sys.exit(1)
 
 
 if __name__ == '__main__':